@@ -14,23 +14,33 @@ The app manages conversations and messages while ensuring stability under load
 through careful resource management and error handling.
 """
 
-from typing import List
+from typing import Annotated, List
 from uuid import UUID
 
 from fastapi import FastAPI, HTTPException, Request, Response, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from prometheus_client import Counter, generate_latest, CollectorRegistry
 from pydantic import BaseModel
 from structlog import get_logger
 import asyncio
+import re
+import time
 from contextlib import asynccontextmanager
 
 from ..domain.models import Conversation, Message
+from ..repositories.base import Repository
+from ..repositories.cached import CachedRepository
 from ..repositories.memory import InMemoryRepository
 from ..services.llm import LLMService
 from .rate_limiter import RateLimiter, rate_limit_middleware
-from .request_queue import process_queued_request, get_request_queue, RequestQueue
+from .request_queue import (
+    BatchCoalescer,
+    process_queued_request,
+    get_request_queue,
+    RequestQueue,
+)
 
 # Registry for isolated metric collection
 CUSTOM_REGISTRY = CollectorRegistry()
@@ -46,10 +56,36 @@ class MessageCreate(BaseModel):
     """Defines the structure for message creation requests"""
     content: str
 
-# Core service instances
-repository = InMemoryRepository()
+class MessageBatchCreate(BaseModel):
+    """Defines the structure for batched message creation requests"""
+    contents: List[str]
+
+# Canonical hyphenated UUID form, used to reject garbage before parsing
+_UUID_RE = re.compile(
+    r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+)
+
+def _parse_conversation_id(conversation_id: str) -> UUID:
+    """Parse the conversation_id path parameter.
+
+    Runs as a dependency so the cheap regex reject fires before UUID's
+    own parser (and pydantic's field machinery) sees malformed input;
+    invalid IDs still yield 422.
+    """
+    if not _UUID_RE.match(conversation_id):
+        raise HTTPException(status_code=422, detail="Invalid conversation ID format")
+    return UUID(conversation_id)
+
+# Path-parameter type for conversation IDs
+ConversationId = Annotated[UUID, Depends(_parse_conversation_id)]
+
+# Core service instances; reads go through an LRU conversation cache
+repository = CachedRepository(InMemoryRepository())
 llm_service = LLMService()
 
+# Coalesces LLM calls from concurrent conversations into micro-batches
+message_batcher = BatchCoalescer(llm_service.process_messages_batch)
+
 # Configure rate limits based on environment
 is_test = __name__ == "konko_ai_chat.api.app"
 rate_limiter = RateLimiter(
@@ -61,16 +97,17 @@ rate_limiter = RateLimiter(
 async def lifespan(app: FastAPI):
     """Handles app startup/shutdown and resource management"""
     queue = get_request_queue()
-    await rate_limiter.start()
+    rate_limiter.start()
     logger.info("application_startup_complete")
     
     yield
-    
+
     await queue.cleanup()
+    await message_batcher.stop()
     await rate_limiter.stop()
     logger.info("application_shutdown_complete")
 
-def get_repository() -> InMemoryRepository:
+def get_repository() -> Repository:
     """Returns the conversation storage instance"""
     return repository
 
@@ -86,7 +123,8 @@ app = FastAPI(
     title="Konko AI Chat API",
     description="A production-grade async chat API with LLM integration",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Enable cross-origin requests
@@ -101,10 +139,16 @@ app.add_middleware(
 # Set up request tracing
 FastAPIInstrumentor.instrument_app(app)
 
+# Paths served without rate limiting (scrape/infra traffic)
+_RATE_LIMIT_EXEMPT_PATHS = ("/metrics",)
+
 @app.middleware("http")
 async def logging_middleware(request: Request, call_next):
     """Tracks requests and enforces rate limits"""
-    logger.info("request_started", path=request.url.path)
+    if request.url.path in _RATE_LIMIT_EXEMPT_PATHS:
+        return await call_next(request)
+
+    logger.debug("request_started", path=request.url.path)
     try:
         await rate_limit_middleware(request, get_rate_limiter())
         response = await call_next(request)
@@ -113,11 +157,16 @@ async def logging_middleware(request: Request, call_next):
         logger.error("request_failed", path=request.url.path, error=str(e))
         raise
 
-@app.get("/conversations", response_model=List[Conversation])
+@app.get(
+    "/conversations",
+    response_model=List[Conversation],
+    # Keep list payloads small: full histories are served per conversation
+    response_model_exclude={"__all__": {"messages"}},
+)
 async def list_conversations(
     limit: int = 100,
     offset: int = 0,
-    repository: InMemoryRepository = Depends(get_repository)
+    repository: Repository = Depends(get_repository)
 ) -> List[Conversation]:
     """Gets paginated conversation list with specified limit and offset"""
     try:
@@ -128,7 +177,7 @@ async def list_conversations(
 
 @app.post("/conversations", response_model=Conversation)
 async def create_conversation(
-    repository: InMemoryRepository = Depends(get_repository)
+    repository: Repository = Depends(get_repository)
 ) -> Conversation:
     """Starts a new conversation thread"""
     try:
@@ -141,8 +190,8 @@ async def create_conversation(
 
 @app.get("/conversations/{conversation_id}", response_model=Conversation)
 async def get_conversation(
-    conversation_id: UUID,
-    repository: InMemoryRepository = Depends(get_repository)
+    conversation_id: ConversationId,
+    repository: Repository = Depends(get_repository)
 ) -> Conversation:
     """Retrieves a specific conversation by its ID"""
     try:
@@ -159,10 +208,10 @@ async def get_conversation(
 
 @app.get("/conversations/{conversation_id}/messages", response_model=List[Message])
 async def get_messages(
-    conversation_id: UUID,
+    conversation_id: ConversationId,
     limit: int = 100,
     offset: int = 0,
-    repository: InMemoryRepository = Depends(get_repository)
+    repository: Repository = Depends(get_repository)
 ) -> List[Message]:
     """Gets paginated message history for a conversation"""
     try:
@@ -178,9 +227,9 @@ async def get_messages(
 
 @app.post("/conversations/{conversation_id}/messages", response_model=Message)
 async def create_message(
-    conversation_id: UUID,
+    conversation_id: ConversationId,
     message: MessageCreate,
-    repository: InMemoryRepository = Depends(get_repository),
+    repository: Repository = Depends(get_repository),
     llm_service: LLMService = Depends(get_llm_service)
 ) -> Message:
     """
@@ -189,17 +238,18 @@ async def create_message(
     """
     async def process_message() -> Message:
         try:
-            conversation = await repository.get_conversation(conversation_id)
+            conversation, messages = await repository.get_conversation_with_messages(conversation_id)
             if not conversation:
                 logger.warning("conversation_not_found_for_message", conversation_id=str(conversation_id))
                 raise HTTPException(status_code=404, detail="Conversation not found")
 
             user_message = Message(conversation_id=conversation_id, content=message.content, role="user")
             await repository.add_message(user_message)
+            messages.append(user_message)
 
-            messages = await repository.get_messages(conversation_id)
-
-            ai_response = await llm_service.process_message(messages)
+            ai_response = await message_batcher.submit(
+                (messages, conversation.last_numeric_result)
+            )
             ai_message = Message(
                 conversation_id=conversation_id,
                 content=ai_response,
@@ -213,8 +263,10 @@ async def create_message(
                 user_message_length=len(message.content),
                 ai_response_length=len(ai_response)
             )
-            
-            return user_message
+
+            # Return the assistant reply (per the documented contract) so
+            # callers don't need a follow-up GET to read the response
+            return ai_message
 
         except HTTPException:
             raise
@@ -230,7 +282,77 @@ async def create_message(
         logger.error("queue_processing_error", conversation_id=str(conversation_id), error=str(e))
         raise HTTPException(status_code=500, detail="Failed to process message")
 
+@app.post("/conversations/{conversation_id}/messages:batch", response_model=List[Message])
+async def create_messages_batch(
+    conversation_id: ConversationId,
+    batch: MessageBatchCreate,
+    repository: Repository = Depends(get_repository),
+    llm_service: LLMService = Depends(get_llm_service)
+) -> List[Message]:
+    """
+    Processes several user messages in one request.
+    One queue slot covers the whole batch, so callers aggregating many
+    messages pay the dispatch overhead once instead of per message.
+    """
+    async def process_batch() -> List[Message]:
+        try:
+            conversation, messages = await repository.get_conversation_with_messages(conversation_id)
+            if not conversation:
+                logger.warning("conversation_not_found_for_batch", conversation_id=str(conversation_id))
+                raise HTTPException(status_code=404, detail="Conversation not found")
+
+            ai_messages: List[Message] = []
+            for content in batch.contents:
+                user_message = Message(conversation_id=conversation_id, content=content, role="user")
+                await repository.add_message(user_message)
+                messages.append(user_message)
+
+                # add_message refreshes last_numeric_result in place, so
+                # each item sees the result of the one before it
+                ai_response = await message_batcher.submit(
+                    (messages, conversation.last_numeric_result)
+                )
+                ai_message = Message(
+                    conversation_id=conversation_id,
+                    content=ai_response,
+                    role="assistant"
+                )
+                await repository.add_message(ai_message)
+                messages.append(ai_message)
+                ai_messages.append(ai_message)
+
+            logger.info(
+                "message_batch_processed",
+                conversation_id=str(conversation_id),
+                batch_size=len(batch.contents)
+            )
+            return ai_messages
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error("create_messages_batch_error", conversation_id=str(conversation_id), error=str(e))
+            raise HTTPException(status_code=500, detail="Failed to process message batch")
+
+    try:
+        return await process_queued_request(conversation_id, process_batch)
+    except TimeoutError:
+        raise HTTPException(status_code=408, detail="Request timeout")
+    except Exception as e:
+        logger.error("queue_processing_error", conversation_id=str(conversation_id), error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to process message batch")
+
+# Rendered metrics output, reused between scrapes for up to a second
+_metrics_cache: bytes = b""
+_metrics_cache_ts: float = 0.0
+_METRICS_CACHE_TTL = 1.0
+
 @app.get("/metrics")
 async def metrics():
     """Provides Prometheus metrics for system monitoring"""
-    return Response(generate_latest(CUSTOM_REGISTRY), media_type="text/plain")
+    global _metrics_cache, _metrics_cache_ts
+    now = time.monotonic()
+    if now - _metrics_cache_ts > _METRICS_CACHE_TTL or not _metrics_cache:
+        _metrics_cache = generate_latest(CUSTOM_REGISTRY)
+        _metrics_cache_ts = now
+    return Response(_metrics_cache, media_type="text/plain")
@@ -1,11 +1,12 @@
 """Rate limiter implementation using sliding window algorithm."""
 
+import array
 import asyncio
 import re
 import time
-from collections import deque
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict, Optional, Tuple, Deque, List
+from typing import Dict, Optional, Tuple, List
 
 from fastapi import HTTPException, Request
 from structlog import get_logger
@@ -14,153 +15,144 @@ logger = get_logger()
 
 @dataclass
 class SlidingWindow:
-    """Sliding window for rate limiting."""
-    
+    """Sliding window for rate limiting backed by a fixed ring buffer.
+
+    Timestamps live in a preallocated array sized to ``max_requests``;
+    acquiring a slot either fills an empty slot or overwrites the oldest
+    expired one, so the steady-state path allocates nothing.
+    """
+
     window_size: float  # Window size in seconds
     max_requests: int   # Maximum requests per window
-    requests: Deque[float]  # Timestamps of requests
+    buf: array.array    # Ring buffer of request timestamps
+    head: int           # Index of the oldest timestamp
+    count: int          # Number of filled slots
     lock: asyncio.Lock
 
     def __init__(self, window_size: float, max_requests: int):
         """Initialize sliding window."""
         self.window_size = window_size
         self.max_requests = max_requests
-        self.requests = deque()
+        self.buf = array.array('d', [0.0] * max_requests)
+        self.head = 0
+        self.count = 0
         self.lock = asyncio.Lock()
 
-    async def _cleanup_old_requests(self, now: float) -> None:
-        """Remove requests outside the current window."""
-        while self.requests and now - self.requests[0] > self.window_size:
-            self.requests.popleft()
-
     async def try_acquire(self) -> bool:
         """Try to acquire a slot in the window."""
         async with self.lock:
-            now = time.time()
-            await self._cleanup_old_requests(now)
-            
-            if len(self.requests) < self.max_requests:
-                self.requests.append(now)
+            now = time.monotonic()
+
+            if self.count < self.max_requests:
+                self.buf[(self.head + self.count) % self.max_requests] = now
+                self.count += 1
                 return True
-                
+
+            if now - self.buf[self.head] > self.window_size:
+                self.buf[self.head] = now
+                self.head = (self.head + 1) % self.max_requests
+                return True
+
             return False
 
 class RateLimiter:
-    """Rate limiter with endpoint-specific limits."""
+    """Token-bucket rate limiter with endpoint-specific limits.
+
+    Each key holds a bucket of ``(tokens, last_refill)`` that is refilled
+    lazily on access, so checking a request is O(1) instead of rescanning
+    a list of timestamps per call. Buckets are striped across shards, each
+    with its own lock, so concurrent requests for different keys don't
+    serialize through a single global lock. Each shard is an LRU-ordered
+    map capped at a fixed size, which bounds memory regardless of key
+    cardinality and makes a background cleanup sweep unnecessary.
+    """
+
+    _NUM_SHARDS = 64
+    _MAX_KEYS = 100_000
 
     def __init__(self, rate_limit: int = 50, time_window: int = 60):
         """Initialize rate limiter with configurable parameters."""
         self.rate_limit = rate_limit
         self.time_window = time_window  # in seconds
-        self.requests: Dict[str, List[float]] = {}
-        self._lock = asyncio.Lock()
-        self._cleanup_task = None
+        # shard -> (lock, key -> (remaining tokens, monotonic last refill))
+        self._shards: List[Tuple[asyncio.Lock, "OrderedDict[str, Tuple[float, float]]"]] = [
+            (asyncio.Lock(), OrderedDict()) for _ in range(self._NUM_SHARDS)
+        ]
+        self._max_keys_per_shard = self._MAX_KEYS // self._NUM_SHARDS
         logger.info(
             "rate_limiter_initialized",
             rate_limit=rate_limit,
             time_window=time_window
         )
 
-    async def start(self):
-        """Start the rate limiter cleanup task."""
-        if self._cleanup_task is None:
-            self._cleanup_task = asyncio.create_task(self._periodic_cleanup())
+    def start(self):
+        """Lifecycle hook retained for app startup; nothing to spawn.
+
+        LRU eviction on insert replaces the old background cleanup task.
+        """
+        pass
 
     async def stop(self):
-        """Stop the rate limiter cleanup task."""
-        if self._cleanup_task is not None:
-            self._cleanup_task.cancel()
-            try:
-                await self._cleanup_task
-            except asyncio.CancelledError:
-                pass
-            self._cleanup_task = None
-
-    async def _periodic_cleanup(self):
-        """Periodically clean up old request timestamps."""
-        while True:
-            try:
-                await asyncio.sleep(self.time_window)
-                async with self._lock:
-                    current_time = time.time()
-                    cutoff_time = current_time - self.time_window
-                    
-                    for key in list(self.requests.keys()):
-                        self.requests[key] = [
-                            ts for ts in self.requests[key]
-                            if ts > cutoff_time
-                        ]
-                        if not self.requests[key]:
-                            del self.requests[key]
-                            
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error("rate_limiter_cleanup_error", error=str(e))
-
-    async def check_rate_limit(self, key: str) -> None:
-        """Check if the request should be rate limited."""
-        # Ensure cleanup task is running
-        await self.start()
-        
-        current_time = time.time()
-        
-        async with self._lock:
-            if key not in self.requests:
-                self.requests[key] = []
-                
-            # Remove old timestamps
-            cutoff_time = current_time - self.time_window
-            self.requests[key] = [
-                ts for ts in self.requests[key]
-                if ts > cutoff_time
-            ]
-            
+        """Lifecycle hook retained for app shutdown; nothing to cancel."""
+        pass
+
+    def _shard(self, key: str) -> Tuple[asyncio.Lock, "OrderedDict[str, Tuple[float, float]]"]:
+        """Get the (lock, buckets) shard owning a key."""
+        return self._shards[hash(key) & (self._NUM_SHARDS - 1)]
+
+    def _refill(self, buckets: "OrderedDict[str, Tuple[float, float]]", key: str, now: float) -> float:
+        """Refill the bucket for a key and return its token count."""
+        tokens, last_refill = buckets.get(key, (float(self.rate_limit), now))
+        return min(
+            float(self.rate_limit),
+            tokens + (now - last_refill) * self.rate_limit / self.time_window
+        )
+
+    async def check_rate_limit(self, key: str, now: Optional[float] = None) -> None:
+        """Check if the request should be rate limited.
+
+        ``now`` lets callers pass an already-read monotonic timestamp
+        (e.g. the event loop's clock) to avoid a second clock read.
+        """
+        current_time = time.monotonic() if now is None else now
+        lock, buckets = self._shard(key)
+
+        async with lock:
+            tokens = self._refill(buckets, key, current_time)
+
             # Check rate limit
-            if len(self.requests[key]) >= self.rate_limit:
+            if tokens < 1:
                 logger.warning(
                     "rate_limit_exceeded",
                     key=key,
-                    current_requests=len(self.requests[key]),
                     rate_limit=self.rate_limit
                 )
                 raise RateLimitExceeded(
                     f"Rate limit of {self.rate_limit} requests per {self.time_window} seconds exceeded"
                 )
-                
-            # Add new timestamp
-            self.requests[key].append(current_time)
+
+            # Consume one token and keep the key most-recently-used
+            buckets[key] = (tokens - 1, current_time)
+            buckets.move_to_end(key)
+            if len(buckets) > self._max_keys_per_shard:
+                buckets.popitem(last=False)
             logger.debug(
                 "request_tracked",
                 key=key,
-                current_requests=len(self.requests[key]),
+                remaining_tokens=int(tokens - 1),
                 rate_limit=self.rate_limit
             )
 
     async def get_remaining_requests(self, key: str) -> int:
         """Get remaining requests for the key."""
-        # Ensure cleanup task is running
-        await self.start()
-        
-        current_time = time.time()
-        
-        async with self._lock:
-            if key not in self.requests:
+        current_time = time.monotonic()
+        lock, buckets = self._shard(key)
+
+        async with lock:
+            if key not in buckets:
                 return self.rate_limit
-                
-            # Remove old timestamps
-            cutoff_time = current_time - self.time_window
-            self.requests[key] = [
-                ts for ts in self.requests[key]
-                if ts > cutoff_time
-            ]
-            
-            return max(0, self.rate_limit - len(self.requests[key]))
-
-    def __del__(self):
-        """Cleanup when the rate limiter is destroyed."""
-        if self._cleanup_task is not None:
-            self._cleanup_task.cancel()
+
+            return max(0, int(self._refill(buckets, key, current_time)))
 
 class RateLimitExceeded(Exception):
     """Exception raised when rate limit is exceeded."""
@@ -178,4 +170,6 @@ async def rate_limit_middleware(
     path = request.url.path
     key = f"{client_ip}:{path}"
 
-    await rate_limiter.check_rate_limit(key)
+    # Read the loop's monotonic clock once and reuse it downstream
+    now = asyncio.get_running_loop().time()
+    await rate_limiter.check_rate_limit(key, now)
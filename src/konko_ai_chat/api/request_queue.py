@@ -4,9 +4,8 @@ import asyncio
 from dataclasses import dataclass
 from typing import Any, Awaitable, Callable, Dict, Optional, List
 from uuid import UUID
+import functools
 import structlog
-from weakref import WeakKeyDictionary
-from collections import OrderedDict
 import contextlib
 
 logger = structlog.get_logger()
@@ -14,27 +13,125 @@ logger = structlog.get_logger()
 
 @dataclass
 class QueuedRequest:
-    """Represents a queued request with its context."""
-    
+    """Represents a queued request with its context.
+
+    Instances are recycled through RequestQueue's freelist, so task and
+    future are cleared (set to None) between uses.
+    """
+
     conversation_id: UUID
-    task: Callable[..., Awaitable[Any]]
+    task: Optional[Callable[..., Awaitable[Any]]]
     args: tuple
     kwargs: dict
-    future: asyncio.Future
-    sequence_number: int  # Added to maintain order
+    future: Optional[asyncio.Future]
+
+
+class BatchCoalescer:
+    """Coalesces individual work items into micro-batches.
+
+    Items submitted within a short window are buffered (up to max_batch
+    items or max_wait seconds) and handed to the batch processor in one
+    call. The processor returns one awaitable per item; each submitter's
+    future resolves as its own item completes, so one slow item never
+    holds up the rest of the batch.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], List[Awaitable[Any]]],
+        max_batch: int = 32,
+        max_wait: float = 0.01  # 10ms coalescing window
+    ) -> None:
+        """Initialize the coalescer with batch size and wait bounds."""
+        self._process_batch = process_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_worker(self) -> None:
+        """Lazily start the batching worker on the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._worker_task is None or self._worker_task.done() or self._loop is not loop:
+            self._queue = asyncio.Queue()
+            self._loop = loop
+            self._worker_task = loop.create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        """Submit one item and wait for its result from the next batch."""
+        self._ensure_worker()
+        future: asyncio.Future = asyncio.Future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Collect items into batches and dispatch them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+
+            # Fill the batch until it's full or the coalescing window closes
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                awaitables = self._process_batch([item for item, _ in batch])
+            except Exception as e:
+                logger.error("batch_processing_error", batch_size=len(batch), error=str(e))
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), awaitable in zip(batch, awaitables):
+                task = asyncio.ensure_future(awaitable)
+                task.add_done_callback(functools.partial(self._fan_out, future))
+
+    @staticmethod
+    def _fan_out(future: asyncio.Future, task: "asyncio.Task") -> None:
+        """Copy one finished item's outcome onto its submitter's future."""
+        if future.done():
+            return
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    async def stop(self) -> None:
+        """Cancel the batching worker."""
+        if self._worker_task is not None and not self._worker_task.done():
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+        self._worker_task = None
 
 
 class RequestQueue:
-    """Handles request queuing and processing."""
-    
-    _instance = None
-    _initialized = False
-    
-    def __new__(cls):
-        """Ensure singleton pattern."""
-        if cls._instance is None:
-            cls._instance = super(RequestQueue, cls).__new__(cls)
-        return cls._instance
+    """Handles request queuing and processing.
+
+    All requests flow through one global FIFO queue drained by a fixed
+    pool of max_concurrent workers, so the number of processor tasks is
+    O(1) rather than one per active conversation. Per-conversation
+    ordering is preserved by a lock keyed on conversation_id: the global
+    queue hands requests to workers in arrival order, and lock waiters
+    are served FIFO.
+
+    Not a singleton: get_request_queue() is the canonical accessor for
+    the shared instance, while direct construction yields independent
+    queues (useful in tests).
+    """
 
     def __init__(
         self,
@@ -46,108 +143,127 @@ class RequestQueue:
         self.queue_timeout = queue_timeout
         self.semaphore = asyncio.Semaphore(max_concurrent)
         self.active_requests = 0
-        self._lock = asyncio.Lock()
-        self.queues: Dict[UUID, asyncio.Queue] = {}
-        self._tasks = WeakKeyDictionary()  # Use weak references to avoid memory leaks
-        self._sequence_counters: Dict[UUID, int] = {}  # Track sequence numbers per conversation
-        self._pending_requests: Dict[UUID, OrderedDict[int, QueuedRequest]] = {}  # Track pending requests
-        self._initialized = True
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._conv_locks: Dict[UUID, asyncio.Lock] = {}
+        # Worker pool; started lazily on the running loop
+        self._tasks: set = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._qr_pool: List[QueuedRequest] = []  # Freelist of recycled request objects
         logger.info("request_queue_initialized", max_concurrent=max_concurrent)
 
     @contextlib.asynccontextmanager
     async def acquire(self):
         """Acquire a slot in the request queue."""
+        # Plain int bumps are atomic under asyncio's cooperative scheduling
+        # (no await between read and write), so no lock is needed here.
         try:
-            async with self._lock:
-                self.active_requests += 1
-                
+            self.active_requests += 1
             async with self.semaphore:
                 yield
-                
         finally:
-            async with self._lock:
-                self.active_requests -= 1
+            self.active_requests -= 1
 
-    async def get_queue_length(self) -> int:
+    def get_queue_length(self) -> int:
         """Get current queue length."""
-        async with self._lock:
-            return self.active_requests
+        return self.active_requests
 
-    async def is_full(self) -> bool:
+    def is_full(self) -> bool:
         """Check if queue is at capacity."""
-        async with self._lock:
-            return self.active_requests >= self.max_concurrent
-
-    async def _get_queue(self, conversation_id: UUID) -> asyncio.Queue:
-        """Get or create queue for conversation."""
-        async with self._lock:
-            if conversation_id not in self.queues:
-                self.queues[conversation_id] = asyncio.Queue()
-                self._sequence_counters[conversation_id] = 0
-                self._pending_requests[conversation_id] = OrderedDict()
-                # Start queue processor task
-                task = asyncio.create_task(self._process_queue(conversation_id))
-                self._tasks[task] = None  # Store task with weak reference
-            return self.queues[conversation_id]
-
-    async def _process_queue(self, conversation_id: UUID) -> None:
-        """Process requests in the queue for a conversation."""
-        queue = self.queues[conversation_id]
-        pending = self._pending_requests[conversation_id]
-        next_sequence = 0  # Track the next sequence number to process
-        
+        return self.active_requests >= self.max_concurrent
+
+    def _ensure_workers(self) -> None:
+        """Lazily start the worker pool on the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._tasks and self._loop is loop:
+            return
+        self.queue = asyncio.Queue()
+        self._conv_locks = {}
+        self._tasks = set()
+        self._loop = loop
+        for _ in range(self.max_concurrent):
+            task = loop.create_task(self._worker())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    _POOL_MAX = 1024
+
+    def _acquire_request(
+        self,
+        conversation_id: UUID,
+        task: Callable[..., Awaitable[Any]],
+        args: tuple,
+        kwargs: dict,
+        future: asyncio.Future
+    ) -> QueuedRequest:
+        """Get a QueuedRequest from the freelist, or allocate a new one."""
+        if self._qr_pool:
+            request = self._qr_pool.pop()
+            request.conversation_id = conversation_id
+            request.task = task
+            request.args = args
+            request.kwargs = kwargs
+            request.future = future
+            return request
+        return QueuedRequest(
+            conversation_id=conversation_id,
+            task=task,
+            args=args,
+            kwargs=kwargs,
+            future=future
+        )
+
+    def _release_request(self, request: QueuedRequest) -> None:
+        """Return a finished QueuedRequest to the freelist."""
+        request.task = None
+        request.args = ()
+        request.kwargs = {}
+        request.future = None
+        if len(self._qr_pool) < self._POOL_MAX:
+            self._qr_pool.append(request)
+
+    async def _worker(self) -> None:
+        """Drain the global queue, serializing requests per conversation.
+
+        The queue is already FIFO, so requests reach workers in arrival
+        order; the per-conversation lock keeps requests for the same
+        conversation from overlapping without any sequence bookkeeping.
+        """
         try:
             while True:
-                request = await queue.get()
-                try:
-                    # Add request to pending
-                    pending[request.sequence_number] = request
-                    
-                    # Process requests in strict sequence order
-                    while next_sequence in pending:
-                        next_request = pending.pop(next_sequence)
-                        
-                        async with self.semaphore:
-                            try:
-                                result = await asyncio.wait_for(
-                                    next_request.task(*next_request.args, **next_request.kwargs),
-                                    timeout=self.queue_timeout
-                                )
-                                if not next_request.future.done():
-                                    next_request.future.set_result(result)
-                            except asyncio.TimeoutError:
-                                if not next_request.future.done():
-                                    next_request.future.set_exception(
-                                        TimeoutError("Request processing timed out")
-                                    )
-                            except Exception as e:
-                                if not next_request.future.done():
-                                    next_request.future.set_exception(e)
-                                logger.error(
-                                    "request_processing_error",
-                                    conversation_id=str(conversation_id),
-                                    sequence=next_sequence,
-                                    error=str(e)
-                                )
-                        
-                        queue.task_done()
-                        next_sequence += 1  # Move to next sequence number
-                        
-                except Exception as e:
-                    logger.error(
-                        "queue_processing_error",
-                        conversation_id=str(conversation_id),
-                        error=str(e)
-                    )
-                    
+                request = await self.queue.get()
+                conv_lock = self._conv_locks.setdefault(
+                    request.conversation_id, asyncio.Lock()
+                )
+
+                async with conv_lock:
+                    try:
+                        result = await asyncio.wait_for(
+                            request.task(*request.args, **request.kwargs),
+                            timeout=self.queue_timeout
+                        )
+                        if not request.future.done():
+                            request.future.set_result(result)
+                    except asyncio.TimeoutError:
+                        if not request.future.done():
+                            request.future.set_exception(
+                                TimeoutError("Request processing timed out")
+                            )
+                    except Exception as e:
+                        if not request.future.done():
+                            request.future.set_exception(e)
+                        logger.error(
+                            "request_processing_error",
+                            conversation_id=str(request.conversation_id),
+                            error=str(e)
+                        )
+
+                if not conv_lock.locked() and not conv_lock._waiters:
+                    self._conv_locks.pop(request.conversation_id, None)
+                self.queue.task_done()
+                self._release_request(request)
+
         except asyncio.CancelledError:
-            logger.info("queue_processor_cancelled", conversation_id=str(conversation_id))
-        finally:
-            async with self._lock:
-                if conversation_id in self.queues and self.queues[conversation_id].empty():
-                    del self.queues[conversation_id]
-                    del self._sequence_counters[conversation_id]
-                    del self._pending_requests[conversation_id]
+            logger.info("queue_worker_cancelled")
 
     async def enqueue_request(
         self,
@@ -157,64 +273,48 @@ class RequestQueue:
         **kwargs: Any
     ) -> Any:
         """Enqueue a request and wait for its execution."""
-        queue = await self._get_queue(conversation_id)
-        
-        async with self._lock:
-            sequence_number = self._sequence_counters[conversation_id]
-            self._sequence_counters[conversation_id] += 1
-            
+        self._ensure_workers()
+
         future = asyncio.Future()
-        request = QueuedRequest(
-            conversation_id=conversation_id,
-            task=task,
-            args=args,
-            kwargs=kwargs,
-            future=future,
-            sequence_number=sequence_number
-        )
-        
+        request = self._acquire_request(conversation_id, task, args, kwargs, future)
+
         try:
-            # Store request in pending dict and queue
-            self._pending_requests[conversation_id][sequence_number] = request
-            await queue.put(request)
-            
+            await self.queue.put(request)
+
             # Wait for result with timeout
             return await asyncio.wait_for(future, timeout=self.queue_timeout)
-            
+
         except asyncio.TimeoutError:
             logger.error(
                 "request_timeout",
-                conversation_id=str(conversation_id),
-                sequence=sequence_number
+                conversation_id=str(conversation_id)
             )
             raise TimeoutError("Request processing timed out")
         except Exception as e:
             logger.error(
                 "request_enqueue_error",
                 conversation_id=str(conversation_id),
-                sequence=sequence_number,
                 error=str(e)
             )
             raise
 
     async def cleanup(self) -> None:
         """Clean up resources."""
-        async with self._lock:
-            # Cancel all queue processor tasks
-            tasks = list(self._tasks.keys())
-            for task in tasks:
-                if not task.done():
-                    task.cancel()
-            
-            if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Clear all queues and tracking structures
-            self.queues.clear()
-            self._tasks.clear()
-            self._sequence_counters.clear()
-            self._pending_requests.clear()
-            logger.info("request_queue_cleaned_up")
+        # Cancel the worker pool
+        tasks = list(self._tasks)
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Clear all queues and tracking structures
+        self.queue = asyncio.Queue()
+        self._conv_locks.clear()
+        self._tasks.clear()
+        self._loop = None
+        logger.info("request_queue_cleaned_up")
 
 
 _request_queue: Optional[RequestQueue] = None
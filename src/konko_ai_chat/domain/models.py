@@ -1,27 +1,74 @@
 """Domain models for the chat application."""
 
-from datetime import datetime
-from typing import List, Optional
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, List, Optional
 from uuid import UUID, uuid4
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+# Pre-seeded ring of IDs so model construction doesn't pay the CSPRNG
+# cost of uuid4() per instance; the ring refills in bulk when drained.
+_UUID_BATCH_SIZE = 1024
+_uuid_batch: Deque[UUID] = deque()
+_uuid_lock = threading.Lock()
+
+
+def _next_uuid() -> UUID:
+    """Return a pre-generated UUID, refilling the ring when it runs dry."""
+    try:
+        return _uuid_batch.popleft()
+    except IndexError:
+        with _uuid_lock:
+            if not _uuid_batch:
+                _uuid_batch.extend(uuid4() for _ in range(_UUID_BATCH_SIZE))
+            return _uuid_batch.popleft()
+
+
+# Timestamps are served from a cache refreshed at ~10ms granularity,
+# which is plenty for created_at/updated_at bookkeeping and avoids a
+# datetime allocation per model construction.
+_NOW_GRANULARITY = 0.01  # seconds
+_now_cache: datetime = datetime.now(timezone.utc)
+_now_stamp: float = time.monotonic()
+
+
+def _cached_utcnow() -> datetime:
+    """Return the current UTC time, cached at ~10ms resolution."""
+    global _now_cache, _now_stamp
+    mono = time.monotonic()
+    if mono - _now_stamp >= _NOW_GRANULARITY:
+        _now_cache = datetime.now(timezone.utc)
+        _now_stamp = mono
+    return _now_cache
 
 
 class Message(BaseModel):
-    """Message model."""
+    """Message model.
+
+    Messages are immutable once constructed; frozen models hash/compare
+    cheaply and can be shared across conversation snapshots safely.
+    """
+
+    model_config = ConfigDict(frozen=True)
 
-    id: UUID = Field(default_factory=uuid4)
+    id: UUID = Field(default_factory=_next_uuid)
     conversation_id: UUID
     content: str
     role: str = "user"  # "user" or "assistant"
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=_cached_utcnow)
     context: Optional[str] = None
 
 
 class Conversation(BaseModel):
     """Conversation model."""
 
-    id: UUID = Field(default_factory=uuid4)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    id: UUID = Field(default_factory=_next_uuid)
+    created_at: datetime = Field(default_factory=_cached_utcnow)
+    updated_at: datetime = Field(default_factory=_cached_utcnow)
     messages: List[Message] = []
+    # Last number produced by the assistant, maintained on write so math
+    # context lookups don't rescan the history
+    last_numeric_result: Optional[int] = None
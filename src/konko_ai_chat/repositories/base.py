@@ -1,7 +1,7 @@
 """Base repository interface."""
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 
 from ..domain.models import Conversation, Message
@@ -25,6 +25,13 @@ class Repository(ABC):
         """Create a new conversation."""
         pass
 
+    @abstractmethod
+    async def get_conversation_with_messages(
+        self, conversation_id: UUID
+    ) -> Tuple[Optional[Conversation], List[Message]]:
+        """Retrieve a conversation and its full message history together."""
+        pass
+
     @abstractmethod
     async def add_message(self, message: Message) -> Message:
         """Add a message to a conversation."""
@@ -0,0 +1,93 @@
+"""LRU-caching repository decorator."""
+
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from uuid import UUID
+import structlog
+
+from ..domain.models import Conversation, Message
+from .base import Repository
+
+logger = structlog.get_logger()
+
+class CachedRepository(Repository):
+    """Repository decorator with an LRU conversation cache.
+
+    Recently accessed conversations are served from a bounded in-process
+    cache so rapid reloads skip the backing repository's lock path.
+    Entries are invalidated on writes and expire after a short TTL to
+    bound staleness.
+    """
+
+    def __init__(
+        self,
+        repository: Repository,
+        max_entries: int = 10_000,
+        ttl: float = 60.0
+    ) -> None:
+        """Initialize the cache in front of a backing repository."""
+        self._repository = repository
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._cache: "OrderedDict[UUID, Tuple[float, Conversation]]" = OrderedDict()
+        logger.info("cached_repository_initialized", max_entries=max_entries, ttl=ttl)
+
+    def _get_cached(self, conversation_id: UUID) -> Optional[Conversation]:
+        """Return a fresh cached conversation, or None on miss/expiry."""
+        entry = self._cache.get(conversation_id)
+        if entry is None:
+            return None
+        cached_at, conversation = entry
+        if time.monotonic() - cached_at > self._ttl:
+            del self._cache[conversation_id]
+            return None
+        self._cache.move_to_end(conversation_id)
+        return conversation
+
+    def _store(self, conversation: Conversation) -> None:
+        """Cache a conversation, evicting the LRU entry past capacity."""
+        self._cache[conversation.id] = (time.monotonic(), conversation)
+        self._cache.move_to_end(conversation.id)
+        if len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+
+    async def get_conversation(self, conversation_id: UUID) -> Optional[Conversation]:
+        """Retrieve a conversation, preferring the cache."""
+        conversation = self._get_cached(conversation_id)
+        if conversation is not None:
+            return conversation
+        conversation = await self._repository.get_conversation(conversation_id)
+        if conversation is not None:
+            self._store(conversation)
+        return conversation
+
+    async def list_conversations(self, limit: int = 100, offset: int = 0) -> List[Conversation]:
+        """List all conversations with pagination."""
+        return await self._repository.list_conversations(limit=limit, offset=offset)
+
+    async def create_conversation(self) -> Conversation:
+        """Create a new conversation and warm the cache with it."""
+        conversation = await self._repository.create_conversation()
+        self._store(conversation)
+        return conversation
+
+    async def get_conversation_with_messages(
+        self, conversation_id: UUID
+    ) -> Tuple[Optional[Conversation], List[Message]]:
+        """Retrieve a conversation and its full message history together."""
+        return await self._repository.get_conversation_with_messages(conversation_id)
+
+    async def add_message(self, message: Message) -> Message:
+        """Add a message and invalidate the cached conversation."""
+        result = await self._repository.add_message(message)
+        self._cache.pop(message.conversation_id, None)
+        return result
+
+    async def get_messages(
+        self, conversation_id: UUID, limit: int = 100, offset: int = 0
+    ) -> List[Message]:
+        """Get messages for a conversation with pagination."""
+        return await self._repository.get_messages(
+            conversation_id, limit=limit, offset=offset
+        )
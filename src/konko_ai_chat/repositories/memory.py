@@ -1,9 +1,11 @@
 """In-memory repository implementation."""
 
 import asyncio
-from typing import Dict, List, Optional
+import re
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 import structlog
+from sortedcontainers import SortedList
 from threading import Lock
 
 from ..domain.models import Conversation, Message
@@ -11,80 +13,118 @@ from .base import Repository
 
 logger = structlog.get_logger()
 
+# First run of digits in an assistant reply, used to track the last
+# numeric result without rescanning history
+_DIGIT_RE = re.compile(r'(\d+)')
+
 class InMemoryRepository(Repository):
-    """Thread-safe in-memory repository implementation."""
-    
-    _instance = None
-    _lock = Lock()
-    _initialized = False
-    
-    def __new__(cls):
-        """Ensure singleton pattern."""
-        with cls._lock:
-            if cls._instance is None:
-                cls._instance = super(InMemoryRepository, cls).__new__(cls)
-                cls._instance._initialized = False
-            return cls._instance
+    """Thread-safe in-memory repository implementation.
+
+    Per-conversation state is guarded by a fixed array of sharded locks
+    keyed on the conversation ID, so requests touching different
+    conversations never contend. Top-level mutations of the conversation
+    map take a separate dict lock.
+
+    Construction is plain: the shared instance lives in the API module
+    and is built once at import (which the import lock already
+    serializes), so no singleton lock machinery is needed here.
+    """
+
+    _NUM_SHARDS = 64
+    # Oldest messages are ejected past this bound so long-running
+    # conversations can't grow memory without limit
+    _MAX_HISTORY = 1000
 
     def __init__(self) -> None:
-        """Initialize the repository with thread-safe storage."""
-        with self._lock:
-            if self._initialized:
-                return
-                
-            self._conversations: Dict[UUID, Conversation] = {}
-            self._messages: Dict[UUID, List[Message]] = {}
-            self._async_lock = asyncio.Lock()
-            self._initialized = True
-            logger.info("repository_initialized")
+        """Initialize the repository with sharded thread-safe storage."""
+        # Keyed by UUID.int: hashing the raw 128-bit int skips the
+        # UUID.__hash__ indirection on every lookup
+        self._conversations: Dict[int, Conversation] = {}
+        self._shards = [asyncio.Lock() for _ in range(self._NUM_SHARDS)]
+        self._dict_lock = asyncio.Lock()
+        # Brief sync lock for snapshotting reads; never held across awaits
+        self._sync_lock = Lock()
+        # Conversations ordered newest-first; kept in step with updated_at
+        self._by_updated: SortedList = SortedList(
+            key=lambda c: -c.updated_at.timestamp()
+        )
+        logger.info("repository_initialized", shards=self._NUM_SHARDS)
+
+    def _shard(self, key: int) -> asyncio.Lock:
+        """Map a conversation key to its shard lock."""
+        return self._shards[key & (self._NUM_SHARDS - 1)]
 
     async def get_conversation(self, conversation_id: UUID) -> Optional[Conversation]:
-        """Retrieve a conversation by ID."""
-        async with self._async_lock:
-            conversation = self._conversations.get(conversation_id)
+        """Retrieve a conversation by ID.
+
+        Lockless: a single dict .get() is atomic under the GIL, so pure
+        reads proceed in parallel with writers.
+        """
+        conversation = self._conversations.get(conversation_id.int)
+        if conversation is None:
+            logger.warning("conversation_not_found", conversation_id=str(conversation_id))
+        return conversation
+
+    async def get_conversation_with_messages(
+        self, conversation_id: UUID
+    ) -> Tuple[Optional[Conversation], List[Message]]:
+        """Retrieve a conversation and its messages under one lock acquire."""
+        key = conversation_id.int
+        async with self._shard(key):
+            conversation = self._conversations.get(key)
             if conversation is None:
                 logger.warning("conversation_not_found", conversation_id=str(conversation_id))
-            return conversation
+                return None, []
+            return conversation, list(conversation.messages)
 
     async def list_conversations(self, limit: int = 100, offset: int = 0) -> List[Conversation]:
-        """List all conversations with pagination."""
-        async with self._async_lock:
-            conversations = sorted(
-                self._conversations.values(),
-                key=lambda c: c.updated_at,
-                reverse=True
-            )
-            return conversations[offset : offset + limit]
+        """List all conversations with pagination.
+
+        The sorted index makes this O(log N + limit) instead of
+        re-sorting every conversation per call.
+        """
+        with self._sync_lock:
+            return list(self._by_updated.islice(offset, offset + limit))
 
     async def create_conversation(self) -> Conversation:
         """Create a new conversation."""
         conversation = Conversation()
-        async with self._async_lock:
-            self._conversations[conversation.id] = conversation
-            self._messages[conversation.id] = []
+        async with self._dict_lock:
+            self._conversations[conversation.id.int] = conversation
+            with self._sync_lock:
+                self._by_updated.add(conversation)
             logger.info("conversation_created", conversation_id=str(conversation.id))
         return conversation
 
     async def add_message(self, message: Message) -> Message:
         """Add a message to a conversation."""
-        async with self._async_lock:
-            conversation = self._conversations.get(message.conversation_id)
+        key = message.conversation_id.int
+        async with self._shard(key):
+            conversation = self._conversations.get(key)
             if not conversation:
                 logger.error(
                     "conversation_not_found_for_message",
                     conversation_id=str(message.conversation_id)
                 )
                 raise ValueError(f"Conversation {message.conversation_id} not found")
-            
-            # Ensure message lists exist
-            if message.conversation_id not in self._messages:
-                self._messages[message.conversation_id] = []
-            
-            # Add message to both storage locations
-            self._messages[message.conversation_id].append(message)
-            conversation.messages = self._messages[message.conversation_id]
-            conversation.updated_at = message.created_at
-            
+
+            # The conversation model is the single source of truth for
+            # messages; trim oldest past the history cap
+            conversation.messages.append(message)
+            if len(conversation.messages) > self._MAX_HISTORY:
+                del conversation.messages[: len(conversation.messages) - self._MAX_HISTORY]
+            # Re-add under the new key so the sorted index stays correct
+            with self._sync_lock:
+                self._by_updated.remove(conversation)
+                conversation.updated_at = message.created_at
+                self._by_updated.add(conversation)
+
+            # Track the assistant's latest numeric result for math context
+            if message.role == "assistant":
+                match = _DIGIT_RE.search(message.content)
+                if match:
+                    conversation.last_numeric_result = int(match.group(1))
+
             logger.info(
                 "message_added",
                 conversation_id=str(message.conversation_id),
@@ -95,17 +135,20 @@ class InMemoryRepository(Repository):
     async def get_messages(
         self, conversation_id: UUID, limit: int = 100, offset: int = 0
     ) -> List[Message]:
-        """Get messages for a conversation with pagination."""
-        async with self._async_lock:
-            if conversation_id not in self._conversations:
-                logger.error(
-                    "conversation_not_found_for_messages",
-                    conversation_id=str(conversation_id)
-                )
-                raise ValueError(f"Conversation {conversation_id} not found")
-                
-            messages = self._messages.get(conversation_id, [])
-            return sorted(
-                messages[offset : offset + limit],
-                key=lambda m: m.created_at
+        """Get messages for a conversation with pagination.
+
+        Lockless: the membership check and slice are each atomic under
+        the GIL and no invariant spans them, so there is nothing for a
+        lock to protect on this pure-read path.
+        """
+        conversation = self._conversations.get(conversation_id.int)
+        if conversation is None:
+            logger.error(
+                "conversation_not_found_for_messages",
+                conversation_id=str(conversation_id)
             )
+            raise ValueError(f"Conversation {conversation_id} not found")
+
+        # Messages append in created_at order, so the slice is
+        # already sorted; no read-side re-sort needed
+        return conversation.messages[offset : offset + limit]
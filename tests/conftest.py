@@ -0,0 +1,71 @@
+"""Shared test fixtures."""
+
+import asyncio
+import os
+
+import httpx
+import orjson
+import pytest
+import pytest_asyncio
+from asgi_lifespan import LifespanManager
+from httpx import ASGITransport, AsyncClient, Limits
+
+from konko_ai_chat.api.app import app
+
+_stdlib_response_json = httpx.Response.json
+
+
+def _fast_json(self, **kwargs):
+    """Parse response bodies with orjson; stdlib handles custom kwargs."""
+    if kwargs:
+        return _stdlib_response_json(self, **kwargs)
+    return orjson.loads(self.content)
+
+
+# The assertion-heavy tests parse growing message lists on every check,
+# so the faster parser pays off across the whole session
+httpx.Response.json = _fast_json
+
+# uvloop roughly halves task-scheduling overhead in the concurrency
+# tests; plain asyncio remains the fallback where it isn't available
+try:
+    import uvloop
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
+
+# Some assertions can only be satisfied by a live Gemini answer; without
+# a key the service degrades to its "0" fallback, so those tests skip
+requires_gemini = pytest.mark.skipif(
+    not os.environ.get("GEMINI_API_KEY"),
+    reason="requires GEMINI_API_KEY; the service falls back to direct calculation without it",
+)
+
+
+def ok(response):
+    """Assert a 200 response and hand it back for chaining."""
+    assert response.status_code == 200
+    return response
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client():
+    """Session-wide API client sharing one ASGI transport.
+
+    Creating a client per test re-initializes the transport and its
+    connection pooling every time; since the app state is module-level
+    anyway, one shared client serves the whole session.
+    """
+    # LifespanManager runs the app's startup/shutdown hooks exactly once
+    # for the session. Wide pool limits keep the load tests from queueing
+    # on the default connection cap; app exceptions surface as 500s like
+    # in production
+    async with LifespanManager(app) as manager:
+        async with AsyncClient(
+            transport=ASGITransport(app=manager.app, raise_app_exceptions=False),
+            base_url="http://test",
+            limits=Limits(max_connections=200, max_keepalive_connections=200),
+        ) as shared_client:
+            yield shared_client
@@ -1,169 +1,164 @@
 """Test complex math operations with context awareness."""
 
 import pytest
-from httpx import AsyncClient
-from konko_ai_chat.api.app import app
 
-@pytest.mark.asyncio
-async def test_complex_math_operations():
+from conftest import ok, requires_gemini
+from konko_ai_chat.api.app import (
+    MessageCreate,
+    create_conversation,
+    create_message,
+    get_llm_service,
+    get_messages,
+    get_repository,
+)
+
+# Chained steps and their expected results
+_CHAINED_OPS = (
+    ("multiply this by 4", "200"),
+    ("add 150 to that", "350"),
+    ("take that number and divide by 2", "175"),
+    ("times it by 3", "525"),
+    ("subtract 25 from this", "500"),
+    ("double that", "1000"),
+    ("take half of this", "500"),
+    ("add 75 to it", "575"),
+    ("times that by 2", "1150"),
+    ("divide this by 5", "230"),
+)
+
+_INFORMAL_OPS = (
+    ("double it", "200"),
+    ("triple that", "600"),
+    ("cut this in half", "300"),
+    ("add another 50 to it", "350"),
+    ("take away 30", "320"),
+    ("multiply it by ten", "3200"),
+    ("knock off 200", "3000"),
+    ("add a hundred", "3100"),
+    ("times by 2", "6200"),
+    ("divide by 100", "62"),
+)
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_complex_math_operations(client):
     """Test complex math operations with various phrasings."""
-    async with AsyncClient(app=app, base_url="http://test") as client:
-        response = await client.post("/conversations")
-        conversation_id = response.json()["id"]
-
-        # Initial calculation
-        response = await client.post(
-            f"/conversations/{conversation_id}/messages",
-            json={"content": "What's 25 times 4?"}
-        )
-        assert response.status_code == 200
-        messages = (await client.get(f"/conversations/{conversation_id}/messages")).json()
-        assert "100" in messages[-1]["content"]
-
-        # Reference previous result with "that"
-        response = await client.post(
-            f"/conversations/{conversation_id}/messages",
-            json={"content": "multiply that by 5"}
-        )
-        assert response.status_code == 200
-        messages = (await client.get(f"/conversations/{conversation_id}/messages")).json()
-        assert "500" in messages[-1]["content"]
-
-        # Use "this" instead of "that"
-        response = await client.post(
-            f"/conversations/{conversation_id}/messages",
-            json={"content": "take this and add 50"}
-        )
-        assert response.status_code == 200
-        messages = (await client.get(f"/conversations/{conversation_id}/messages")).json()
-        assert "550" in messages[-1]["content"]
-
-        # Mix operation words
-        response = await client.post(
-            f"/conversations/{conversation_id}/messages",
-            json={"content": "times that by 2"}
-        )
-        assert response.status_code == 200
-        messages = (await client.get(f"/conversations/{conversation_id}/messages")).json()
-        assert "1100" in messages[-1]["content"]
-
-@pytest.mark.asyncio
-async def test_mixed_operations_with_context():
+    response = await client.post("/conversations")
+    conversation_id = response.json()["id"]
+
+    # Initial calculation
+    response = ok(await client.post(
+        f"/conversations/{conversation_id}/messages",
+        json={"content": "What's 25 times 4?"}
+    ))
+    assert "100" in response.json()["content"]
+
+    # Reference previous result with "that"
+    response = ok(await client.post(
+        f"/conversations/{conversation_id}/messages",
+        json={"content": "multiply that by 5"}
+    ))
+    assert "500" in response.json()["content"]
+
+    # Use "this" instead of "that"
+    response = ok(await client.post(
+        f"/conversations/{conversation_id}/messages",
+        json={"content": "take this and add 50"}
+    ))
+    assert "550" in response.json()["content"]
+
+    # Mix operation words
+    response = ok(await client.post(
+        f"/conversations/{conversation_id}/messages",
+        json={"content": "times that by 2"}
+    ))
+    assert "1100" in response.json()["content"]
+
+@pytest.mark.asyncio(loop_scope="session")
+async def test_mixed_operations_with_context(client):
     """Test mixed operations using previous results."""
-    async with AsyncClient(app=app, base_url="http://test") as client:
-        response = await client.post("/conversations")
-        conversation_id = response.json()["id"]
-
-        # Start with a simple calculation
-        response = await client.post(
-            f"/conversations/{conversation_id}/messages",
-            json={"content": "Start with 1000"}
-        )
-        assert response.status_code == 200
-        messages = (await client.get(f"/conversations/{conversation_id}/messages")).json()
-        assert "1000" in messages[-1]["content"]
-
-        # Subtract using "take away"
-        response = await client.post(
-            f"/conversations/{conversation_id}/messages",
-            json={"content": "take away 200 from that"}
-        )
-        assert response.status_code == 200
-        messages = (await client.get(f"/conversations/{conversation_id}/messages")).json()
-        assert "800" in messages[-1]["content"]
-
-        # Multiply using "times by"
-        response = await client.post(
-            f"/conversations/{conversation_id}/messages",
-            json={"content": "times that by 3"}
-        )
-        assert response.status_code == 200
-        messages = (await client.get(f"/conversations/{conversation_id}/messages")).json()
-        assert "2400" in messages[-1]["content"]
-
-        # Divide using informal language
-        response = await client.post(
-            f"/conversations/{conversation_id}/messages",
-            json={"content": "now divide this by 8"}
-        )
-        assert response.status_code == 200
-        messages = (await client.get(f"/conversations/{conversation_id}/messages")).json()
-        assert "300" in messages[-1]["content"]
-
-@pytest.mark.asyncio
-async def test_complex_chained_operations():
-    """Test complex chained operations with various phrasings."""
-    async with AsyncClient(app=app, base_url="http://test") as client:
-        response = await client.post("/conversations")
-        conversation_id = response.json()["id"]
-
-        # Initial value
-        response = await client.post(
-            f"/conversations/{conversation_id}/messages",
-            json={"content": "Let's start with 50"}
-        )
-        assert response.status_code == 200
-        messages = (await client.get(f"/conversations/{conversation_id}/messages")).json()
-        assert "50" in messages[-1]["content"]
-
-        # Chain of operations with different phrasings
-        operations = [
-            ("multiply this by 4", "200"),
-            ("add 150 to that", "350"),
-            ("take that number and divide by 2", "175"),
-            ("times it by 3", "525"),
-            ("subtract 25 from this", "500"),
-            ("double that", "1000"),
-            ("take half of this", "500"),
-            ("add 75 to it", "575"),
-            ("times that by 2", "1150"),
-            ("divide this by 5", "230")
-        ]
-
-        for operation, expected in operations:
-            response = await client.post(
-                f"/conversations/{conversation_id}/messages",
-                json={"content": operation}
-            )
-            assert response.status_code == 200
-            messages = (await client.get(f"/conversations/{conversation_id}/messages")).json()
-            assert expected in messages[-1]["content"]
-
-@pytest.mark.asyncio
-async def test_informal_math_language():
-    """Test informal mathematical language and expressions."""
-    async with AsyncClient(app=app, base_url="http://test") as client:
-        response = await client.post("/conversations")
-        conversation_id = response.json()["id"]
-
-        # Start with a number
-        response = await client.post(
-            f"/conversations/{conversation_id}/messages",
-            json={"content": "start with the number 100"}
+    response = await client.post("/conversations")
+    conversation_id = response.json()["id"]
+
+    # Start with a simple calculation
+    response = ok(await client.post(
+        f"/conversations/{conversation_id}/messages",
+        json={"content": "Start with 1000"}
+    ))
+    assert "1000" in response.json()["content"]
+
+    # Subtract using "take away"
+    response = ok(await client.post(
+        f"/conversations/{conversation_id}/messages",
+        json={"content": "take away 200 from that"}
+    ))
+    assert "800" in response.json()["content"]
+
+    # Multiply using "times by"
+    response = ok(await client.post(
+        f"/conversations/{conversation_id}/messages",
+        json={"content": "times that by 3"}
+    ))
+    assert "2400" in response.json()["content"]
+
+    # Divide using informal language
+    response = ok(await client.post(
+        f"/conversations/{conversation_id}/messages",
+        json={"content": "now divide this by 8"}
+    ))
+    assert "300" in response.json()["content"]
+
+# Each scenario is an independent conversation chain, so parametrizing
+# keeps the per-step ordering while letting the chains run (and fail)
+# separately — including under pytest-xdist workers.
+_CHAIN_SCENARIOS = [
+    pytest.param("Let's start with 50", "50", _CHAINED_OPS, id="chained_operations"),
+    # The informal chain includes steps ("take away 30") only the LLM
+    # path can answer, so it needs a live backend
+    pytest.param(
+        "start with the number 100", "100", _INFORMAL_OPS,
+        id="informal_math_language", marks=requires_gemini,
+    ),
+]
+
+@pytest.mark.asyncio(loop_scope="session")
+@pytest.mark.parametrize("opening, opening_expected, steps", _CHAIN_SCENARIOS)
+async def test_chained_operation_scenarios(opening, opening_expected, steps):
+    """Test chained operations carrying context through a conversation.
+
+    These scenarios only check message content, so they invoke the route
+    handlers directly and skip the ASGI/HTTP machinery; the httpx-based
+    tests above keep covering the full end-to-end path.
+    """
+    repository = get_repository()
+    llm_service = get_llm_service()
+    conversation = await create_conversation(repository=repository)
+
+    # Initial value
+    reply = await create_message(
+        conversation.id,
+        MessageCreate(content=opening),
+        repository=repository,
+        llm_service=llm_service,
+    )
+    assert opening_expected in reply.content
+
+    # Chain of operations with different phrasings
+    for operation, expected in steps:
+        reply = await create_message(
+            conversation.id,
+            MessageCreate(content=operation),
+            repository=repository,
+            llm_service=llm_service,
         )
-        assert response.status_code == 200
-        messages = (await client.get(f"/conversations/{conversation_id}/messages")).json()
-        assert "100" in messages[-1]["content"]
-
-        # Test various informal expressions
-        expressions = [
-            ("double it", "200"),
-            ("triple that", "600"),
-            ("cut this in half", "300"),
-            ("add another 50 to it", "350"),
-            ("take away 30", "320"),
-            ("multiply it by ten", "3200"),
-            ("knock off 200", "3000"),
-            ("add a hundred", "3100"),
-            ("times by 2", "6200"),
-            ("divide by 100", "62")
-        ]
-
-        for expr, expected in expressions:
-            response = await client.post(
-                f"/conversations/{conversation_id}/messages",
-                json={"content": expr}
-            )
-            assert response.status_code == 200
-            messages = (await client.get(f"/conversations/{conversation_id}/messages")).json()
-            assert expected in messages[-1]["content"] 
+        assert expected in reply.content
+
+    # One cumulative fetch validates the stored chain instead of
+    # re-listing the growing history after every step
+    messages = await get_messages(conversation.id, repository=repository)
+    replies = [m.content for m in messages if m.role == "assistant"]
+    assert len(replies) == len(steps) + 1
+    assert opening_expected in replies[0]
+    assert all(
+        expected in reply
+        for (_, expected), reply in zip(steps, replies[1:])
+    )
@@ -0,0 +1,52 @@
+"""Unit tests for the in-memory repository."""
+
+import asyncio
+from uuid import UUID
+
+import pytest
+
+from konko_ai_chat.domain.models import Message
+from konko_ai_chat.repositories.memory import InMemoryRepository
+
+
+@pytest.mark.asyncio
+async def test_lockless_reads_during_concurrent_writes():
+    """Reads stay consistent while a writer appends concurrently."""
+    repo = InMemoryRepository()
+    conversation = await repo.create_conversation()
+
+    async def writer():
+        for i in range(50):
+            await repo.add_message(
+                Message(
+                    conversation_id=conversation.id,
+                    content=f"Message {i}",
+                    role="user"
+                )
+            )
+            await asyncio.sleep(0)
+
+    async def reader():
+        for _ in range(50):
+            conv = await repo.get_conversation(conversation.id)
+            assert conv is conversation
+            messages = await repo.get_messages(conversation.id, limit=1000)
+            # Whatever prefix the reader observes is ordered and intact
+            assert [m.content for m in messages] == [
+                f"Message {i}" for i in range(len(messages))
+            ]
+            await asyncio.sleep(0)
+
+    await asyncio.gather(writer(), reader())
+
+    messages = await repo.get_messages(conversation.id, limit=1000)
+    assert len(messages) == 50
+
+
+@pytest.mark.asyncio
+async def test_get_messages_unknown_conversation_raises():
+    """Missing conversations still raise ValueError on the read path."""
+    repo = InMemoryRepository()
+
+    with pytest.raises(ValueError):
+        await repo.get_messages(UUID(int=0))